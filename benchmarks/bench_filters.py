@@ -0,0 +1,108 @@
+"""
+Benchmark for processor filter pushdown.
+Generates a synthetic raw corpus and times narrow extracts against a full
+run, showing that the cost follows the selected slice rather than the corpus,
+both with a complete archive catalog and with none (cold).
+
+Usage:
+    python benchmarks/bench_filters.py --users 8 --months 12 --games 200
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from chess_catalog import CATALOG_FILENAME  # noqa: E402
+from chess_process import ChessProcessor, GameFilter  # noqa: E402
+from utils import save_json_safely  # noqa: E402
+
+PGN_MOVES = "1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 4. Ba4 Nf6 5. O-O Be7 6. Re1 b5 7. Bb3 d6 8. c3 O-O"
+TIME_CONTROLS = ['60', '180+2', '300', '600', '900+10', '1/86400']
+
+
+def make_game(white: str, black: str, end_time: int, rng: random.Random) -> dict:
+    """Build one synthetic game record in Chess.com API format."""
+    white_wins = rng.random() < 0.5
+    return {
+        'url': f"https://www.chess.com/game/live/{rng.getrandbits(48)}",
+        'pgn': f'[Event "Live Chess"]\n[ECO "C84"]\n[Result "{"1-0" if white_wins else "0-1"}"]\n\n{PGN_MOVES}',
+        'time_control': rng.choice(TIME_CONTROLS),
+        'end_time': end_time,
+        'white': {'username': white, 'rating': rng.randint(800, 2800), 'result': 'win' if white_wins else 'resigned'},
+        'black': {'username': black, 'rating': rng.randint(800, 2800), 'result': 'resigned' if white_wins else 'win'}
+    }
+
+
+def generate_corpus(raw_dir: str, users: int, months: int, games: int) -> None:
+    """Write users x months archives of games each into raw_dir."""
+    rng = random.Random(42)
+    names = [f"player{i}" for i in range(users)]
+    for name in names:
+        for m in range(months):
+            year, month = 2023 + m // 12, m % 12 + 1
+            start = int(datetime(year, month, 2).timestamp())
+            data = {'games': [
+                make_game(name, rng.choice(names), start + rng.randint(0, 25 * 86400), rng)
+                for _ in range(games)
+            ]}
+            save_json_safely(data, os.path.join(raw_dir, f"{name}_{year}_{month:02d}.json"))
+
+
+def time_extract(raw_dir: str, game_filter: GameFilter = None) -> tuple:
+    """Run the processor and return (seconds, games extracted)."""
+    processor = ChessProcessor(raw_dir, game_filter=game_filter)
+    start = time.perf_counter()
+    df = processor.process_all_files()
+    return time.perf_counter() - start, len(df)
+
+
+def main():
+    """Main function to handle command line execution."""
+    parser = argparse.ArgumentParser(description='Benchmark filter pushdown in the processor')
+    parser.add_argument('--users', type=int, default=8, help='Number of synthetic users')
+    parser.add_argument('--months', type=int, default=12, help='Number of monthly archives per user')
+    parser.add_argument('--games', type=int, default=200, help='Games per archive')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as raw_dir:
+        generate_corpus(raw_dir, args.users, args.months, args.games)
+        catalog_path = os.path.join(raw_dir, CATALOG_FILENAME)
+        one_user = GameFilter(users=['player0'])
+        one_user_month = GameFilter(users=['player0'], start_date='2023-03-01', end_date='2023-03-31')
+
+        # Cold cases start without a catalog; the first full run builds it for the rest
+        cases = [
+            ('one user (cold)', one_user, True),
+            ('one user, month (cold)', one_user_month, True),
+            ('full corpus (cold)', None, True),
+            ('full corpus', None, False),
+            ('one user', one_user, False),
+            ('one month', GameFilter(start_date='2023-03-01', end_date='2023-03-31'), False),
+            ('blitz only', GameFilter(game_types=['blitz']), False),
+            ('rating 2000+', GameFilter(min_rating=2000), False),
+            ('one user, one month', one_user_month, False),
+        ]
+
+        results = []
+        for name, game_filter, cold in cases:
+            if cold and os.path.exists(catalog_path):
+                os.remove(catalog_path)
+            results.append((name,) + time_extract(raw_dir, game_filter))
+
+        full_time = dict((name, seconds) for name, seconds, _ in results)['full corpus']
+        print(f"{'case':<26}{'games':>8}{'seconds':>10}{'vs full':>9}")
+        for name, seconds, games in results:
+            print(f"{name:<26}{games:>8}{seconds:>10.3f}{seconds / full_time:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Startup-time benchmark for the chess_etl.py subcommands.
+Runs each subcommand with --help in a fresh interpreter and reports the
+median wall time and which heavy dependencies it imported.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+HEAVY_MODULES = ['pandas', 'chess', 'requests']
+
+# Runs one subcommand in-process, then reports which heavy modules it loaded
+PROBE = f"""
+import sys
+sys.path.insert(0, {SRC_DIR!r})
+import chess_etl
+try:
+    chess_etl.main(sys.argv[1:])
+except SystemExit:
+    pass
+print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules), file=sys.stderr)
+"""
+
+
+def time_command(args: list, repeat: int) -> tuple:
+    """Return (median seconds, loaded heavy modules) for a subcommand."""
+    timings = []
+    loaded = ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', PROBE] + args,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        timings.append(time.perf_counter() - start)
+        loaded = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ''
+    return statistics.median(timings), loaded
+
+
+def main():
+    """Main function to handle command line execution."""
+    parser = argparse.ArgumentParser(description='Benchmark chess_etl.py startup time per subcommand')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per subcommand')
+    args = parser.parse_args()
+
+    baseline = statistics.median(
+        _timed([sys.executable, '-c', 'pass']) for _ in range(args.repeat)
+    )
+
+    cases = [
+        ('(interpreter only)', None),
+        ('chess_etl.py --help', ['--help']),
+        ('fetch --help', ['fetch', '--help']),
+        ('stats --help', ['stats', '--help']),
+        ('worker --help', ['worker', '--help']),
+        ('process --help', ['process', '--help']),
+    ]
+
+    print(f"{'command':<24}{'median ms':>10}{'over python':>13}  heavy imports")
+    for name, command in cases:
+        if command is None:
+            print(f"{name:<24}{baseline * 1000:>10.1f}{'':>13}")
+            continue
+        seconds, loaded = time_command(command, args.repeat)
+        print(f"{name:<24}{seconds * 1000:>10.1f}{(seconds - baseline) * 1000:>12.1f}  {loaded or '-'}")
+
+
+def _timed(command: list) -> float:
+    """Run a command once and return its wall time in seconds."""
+    start = time.perf_counter()
+    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
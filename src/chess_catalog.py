@@ -0,0 +1,288 @@
+"""
+Raw archive catalog module.
+Maintains a sidecar file in the raw data directory describing every
+downloaded monthly archive (user, month, game count, size, hash, end_time
+range, download time), so that fetch summaries and processing plans do not
+need to re-read the archives themselves.
+"""
+
+import hashlib
+import logging
+import os
+import time
+import uuid
+from typing import Dict, List, Any, Optional
+
+from chess_leases import LeaseManager
+from utils import load_json_safely, save_json_safely, list_json_files, parse_archive_filename
+
+CATALOG_FILENAME = '.catalog.json'
+
+
+def hash_file(filepath: str) -> str:
+    """
+    Compute the SHA-256 hash of a file.
+
+    Args:
+        filepath: Path to file
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArchiveCatalog:
+    """Reads and atomically updates the archive catalog of a raw data directory."""
+
+    def __init__(self, raw_data_dir: str = 'data/raw', lock_timeout: float = 30.0):
+        """
+        Initialize the catalog.
+
+        Args:
+            raw_data_dir: Directory containing raw JSON files
+            lock_timeout: Seconds to wait for another writer before giving up
+        """
+        self.raw_data_dir = raw_data_dir
+        self.path = os.path.join(raw_data_dir, CATALOG_FILENAME)
+        self.lock_timeout = lock_timeout
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load catalog entries.
+
+        Returns:
+            Dictionary mapping archive file names to their entries
+        """
+        if not os.path.exists(self.path):
+            return {}
+        data = load_json_safely(self.path)
+        if not data:
+            return {}
+        return data.get('archives', {})
+
+    def describe_archive(self, filepath: str, data: Optional[Dict[str, Any]] = None,
+                         downloaded_at: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Build the catalog entry for an archive file.
+
+        Args:
+            filepath: Path to archive file
+            data: Parsed archive contents if already in memory
+            downloaded_at: Download timestamp (defaults to the file mtime)
+
+        Returns:
+            Catalog entry or None if the file cannot be read
+        """
+        if data is None:
+            data = load_json_safely(filepath)
+            if data is None:
+                return None
+
+        parsed = parse_archive_filename(filepath)
+        user, year, month = parsed if parsed else (None, None, None)
+        end_times = [g['end_time'] for g in data.get('games', []) if g.get('end_time')]
+        stat = os.stat(filepath)
+
+        return {
+            'user': user.lower() if user else None,
+            'year': year,
+            'month': month,
+            'games': len(data.get('games', [])),
+            'bytes': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': hash_file(filepath),
+            'min_end_time': min(end_times) if end_times else None,
+            'max_end_time': max(end_times) if end_times else None,
+            'downloaded_at': downloaded_at if downloaded_at is not None else stat.st_mtime
+        }
+
+    def is_stale(self, filepath: str, archives: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Check whether an archive is missing from the catalog or changed on disk.
+
+        Args:
+            filepath: Path to archive file
+            archives: Catalog entries as returned by load
+
+        Returns:
+            True if the archive needs a new catalog entry
+        """
+        entry = archives.get(os.path.basename(filepath))
+        if entry is None:
+            return True
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            return True
+        return entry['bytes'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns
+
+    def update(self, changes: Dict[str, Optional[Dict[str, Any]]]) -> bool:
+        """
+        Apply entry changes under the catalog lock and write the catalog atomically.
+
+        Failures (e.g. a read-only raw directory) are logged, not raised: the
+        catalog is an optimization and callers work without it.
+
+        Args:
+            changes: File name to new entry, or None to remove the entry
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            leases = LeaseManager(self.raw_data_dir, ttl=self.lock_timeout)
+            owner = uuid.uuid4().hex
+            deadline = time.time() + self.lock_timeout
+
+            lease = leases.acquire(CATALOG_FILENAME, owner)
+            while lease is None:
+                if time.time() > deadline:
+                    logging.warning(f"Timed out waiting for catalog lock in {self.raw_data_dir}")
+                    return False
+                time.sleep(0.1)
+                lease = leases.acquire(CATALOG_FILENAME, owner)
+
+            with lease:
+                archives = self.load()
+                for filename, entry in changes.items():
+                    if entry is None:
+                        archives.pop(filename, None)
+                    else:
+                        archives[filename] = entry
+                return save_json_safely({'version': 1, 'archives': archives}, self.path)
+        except OSError as e:
+            logging.warning(f"Could not update archive catalog in {self.raw_data_dir}: {e}")
+            return False
+
+    def record(self, filepath: str, data: Dict[str, Any]) -> bool:
+        """
+        Record a freshly downloaded archive.
+
+        Args:
+            filepath: Path the archive was saved to
+            data: Archive contents as downloaded
+
+        Returns:
+            True if successful, False otherwise
+        """
+        entry = self.describe_archive(filepath, data, downloaded_at=time.time())
+        if entry is None:
+            return False
+        return self.update({os.path.basename(filepath): entry})
+
+    def refresh(self, filepaths: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Bring the catalog in line with the archives on disk.
+
+        Only archives that are missing from the catalog or whose size or
+        mtime changed are read; entries for deleted archives are dropped.
+
+        Args:
+            filepaths: Archives to check (defaults to all JSON files in the raw directory)
+
+        Returns:
+            Dictionary with 'archives' (current entries by file name) and
+            'changed' (file names added or updated by this refresh)
+        """
+        full_scan = filepaths is None
+        if full_scan:
+            filepaths = list_json_files(self.raw_data_dir)
+
+        archives = self.load()
+        changes: Dict[str, Optional[Dict[str, Any]]] = {}
+
+        for filepath in filepaths:
+            filename = os.path.basename(filepath)
+            if not os.path.exists(filepath):
+                if filename in archives:
+                    changes[filename] = None
+                continue
+            if not self.is_stale(filepath, archives):
+                continue
+            entry = self.describe_archive(filepath)
+            if entry is not None:
+                changes[filename] = entry
+
+        if full_scan:
+            on_disk = {os.path.basename(fp) for fp in filepaths}
+            for filename in archives:
+                if filename not in on_disk:
+                    changes[filename] = None
+
+        if changes:
+            if self.update(changes):
+                logging.info(f"Updated catalog entries for {len(changes)} archives")
+            for filename, entry in changes.items():
+                if entry is None:
+                    archives.pop(filename, None)
+                else:
+                    archives[filename] = entry
+
+        return {
+            'archives': archives,
+            'changed': sorted(name for name, entry in changes.items() if entry is not None)
+        }
+
+    def summarize(self, username: Optional[str] = None, start_year: Optional[int] = None,
+                  end_year: Optional[int] = None,
+                  archives: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Summarize catalog entries, optionally for one user and year range.
+
+        Args:
+            username: Only include this user's archives
+            start_year: Only include archives from this year onwards
+            end_year: Only include archives up to this year
+            archives: Entries to summarize, e.g. as returned by refresh
+                (defaults to the catalog on disk)
+
+        Returns:
+            Dictionary with archive, game and byte totals and the end_time range
+        """
+        summary = {
+            'archives': 0,
+            'games': 0,
+            'bytes': 0,
+            'min_end_time': None,
+            'max_end_time': None
+        }
+
+        if archives is None:
+            archives = self.load()
+
+        for entry in archives.values():
+            if username and entry.get('user') != username.lower():
+                continue
+            if start_year and (entry.get('year') or 0) < start_year:
+                continue
+            if end_year and (entry.get('year') or 0) > end_year:
+                continue
+
+            summary['archives'] += 1
+            summary['games'] += entry['games']
+            summary['bytes'] += entry['bytes']
+            if entry.get('min_end_time') is not None:
+                current = summary['min_end_time']
+                summary['min_end_time'] = entry['min_end_time'] if current is None else min(current, entry['min_end_time'])
+            if entry.get('max_end_time') is not None:
+                current = summary['max_end_time']
+                summary['max_end_time'] = entry['max_end_time'] if current is None else max(current, entry['max_end_time'])
+
+        return summary
+
+    def changed_since(self, timestamp: float) -> List[str]:
+        """
+        List archives downloaded or modified after a point in time.
+
+        Args:
+            timestamp: Unix timestamp, e.g. the mtime of the last processed dataset
+
+        Returns:
+            Sorted archive file names
+        """
+        return sorted(name for name, entry in self.load().items() if entry['downloaded_at'] > timestamp)
@@ -0,0 +1,146 @@
+"""
+Unified command line entry point for the chess ETL project.
+Dispatches subcommands to the fetch, process, stats and worker modules,
+importing each module (and its heavy dependencies such as pandas or
+python-chess) only when its subcommand runs. A batch mode runs many jobs
+from a file in one interpreter.
+
+Usage:
+    python src/chess_etl.py fetch --user hikaru
+    python src/chess_etl.py process --game-types blitz
+    python src/chess_etl.py batch jobs.txt
+"""
+
+import importlib
+import logging
+import shlex
+import sys
+from typing import List, Optional
+
+# Subcommand -> (module, description). Modules are imported on first use.
+COMMANDS = {
+    'fetch': ('chess_fetch', 'Download games for a user from Chess.com'),
+    'process': ('chess_process', 'Process raw JSON files into the CSV dataset'),
+    'stats': ('chess_stats', 'Summarize and merge streaming statistics files'),
+    'worker': ('chess_worker', 'Distributed processing: work and merge subcommands'),
+    'batch': (None, 'Run jobs from a file (one command per line) in this interpreter'),
+}
+
+
+def print_usage() -> None:
+    """Print the list of subcommands."""
+    print("usage: chess_etl.py <command> [options]\n\ncommands:")
+    for name, (_, description) in COMMANDS.items():
+        print(f"  {name:<10}{description}")
+    print("\nRun 'chess_etl.py <command> --help' for command options.")
+
+
+def run_command(argv: List[str]) -> int:
+    """
+    Run one subcommand.
+
+    Args:
+        argv: Subcommand name followed by its arguments
+
+    Returns:
+        Exit code (0 on success)
+    """
+    if not argv or argv[0] in ('-h', '--help'):
+        print_usage()
+        return 0
+
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"chess_etl.py: unknown command '{command}'", file=sys.stderr)
+        print_usage()
+        return 2
+
+    if command == 'batch':
+        return run_batch(args)
+
+    module = importlib.import_module(COMMANDS[command][0])
+    try:
+        module.main(args)
+    except SystemExit as e:
+        # argparse errors, --help and failed runs exit; keep batch mode alive
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    return 0
+
+
+def run_batch(argv: List[str]) -> int:
+    """
+    Run a batch of jobs from a file without starting a new interpreter per job.
+
+    Each non-empty line not starting with # is one command line, e.g.
+    "fetch --user hikaru --start-year 2024". Modules imported by earlier
+    jobs stay loaded for later ones.
+
+    Args:
+        argv: Batch arguments (job file and options)
+
+    Returns:
+        Exit code (0 if every job succeeded)
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='chess_etl.py batch', description=COMMANDS['batch'][1])
+    parser.add_argument('jobs_file', help="File with one command per line, or '-' for stdin")
+    parser.add_argument('--stop-on-error', action='store_true', help='Stop at the first failed job')
+
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+
+    if args.jobs_file == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        try:
+            with open(args.jobs_file, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            try:
+                parser.error(f"cannot read jobs file: {e}")
+            except SystemExit as exit_error:
+                return exit_error.code
+
+    jobs = [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+    failed = 0
+
+    for i, job in enumerate(jobs, 1):
+        try:
+            job_argv = shlex.split(job)
+            if job_argv and job_argv[0] == 'batch':
+                logging.error(f"Job {i}: nested batch jobs are not supported")
+                code = 2
+            else:
+                code = run_command(job_argv)
+        except Exception as e:
+            # One broken job must not end a long-running batch
+            logging.exception(f"Job {i} raised {type(e).__name__}: {e}")
+            code = 1
+
+        if code != 0:
+            failed += 1
+            logging.error(f"Job {i}/{len(jobs)} failed with exit code {code}: {job}")
+            if args.stop_on_error:
+                break
+
+    logging.info(f"Batch finished: {len(jobs) - failed} succeeded, {failed} failed")
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main function to handle command line execution.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+    """
+    sys.exit(run_command(sys.argv[1:] if argv is None else argv))
+
+
+if __name__ == "__main__":
+    main()
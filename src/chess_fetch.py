@@ -9,9 +9,10 @@ import os
 import requests
 import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from urllib.parse import urlparse
 
+from chess_catalog import ArchiveCatalog
 from utils import setup_logging, save_json_safely
 
 
@@ -26,6 +27,7 @@ class ChessFetcher:
             base_data_dir: Base directory for storing raw data
         """
         self.base_data_dir = base_data_dir
+        self.catalog = ArchiveCatalog(base_data_dir)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Chess ETL Project (Educational Purpose)'
@@ -128,9 +130,11 @@ class ChessFetcher:
             data = response.json()
             games = data.get('games', [])
             
-            # Save to file
+            # Save to file and record it in the catalog
             if save_json_safely(data, filepath):
                 logging.info(f"Saved {len(games)} games to {filename}")
+                if not self.catalog.record(filepath, data):
+                    logging.warning(f"Could not record {filename} in the archive catalog")
                 return True
             else:
                 return False
@@ -159,7 +163,8 @@ class ChessFetcher:
             'archives_found': 0,
             'archives_downloaded': 0,
             'archives_skipped': 0,
-            'total_games': 0
+            'total_games': 0,
+            'total_bytes': 0
         }
         
         # Get archive URLs
@@ -196,32 +201,33 @@ class ChessFetcher:
             if i < len(filtered_archives) - 1:  # Don't wait after last request
                 time.sleep(delay)
         
-        # Count total games downloaded
-        try:
-            for filename in os.listdir(self.base_data_dir):
-                if filename.startswith(f"{username}_") and filename.endswith('.json'):
-                    # Check if filename year is in range
-                    parts = filename.split('_')
-                    if len(parts) >= 2:
-                        file_year = int(parts[1])
-                        if start_year and file_year < start_year:
-                            continue
-                        if end_year and file_year > end_year:
-                            continue
-                            
-                    filepath = os.path.join(self.base_data_dir, filename)
-                    with open(filepath, 'r') as f:
-                        import json
-                        data = json.load(f)
-                        stats['total_games'] += len(data.get('games', []))
-        except Exception as e:
-            logging.warning(f"Error counting total games: {e}")
+        # Catalog archives downloaded before the catalog existed and drop
+        # entries of this user's archives that were deleted since, then count
+        # games from the catalog instead of re-reading every archive
+        filepaths = {
+            os.path.join(self.base_data_dir, self.get_archive_filename(username, arch))
+            for arch in filtered_archives
+        }
+        filepaths.update(
+            os.path.join(self.base_data_dir, filename)
+            for filename, entry in self.catalog.load().items()
+            if entry.get('user') == username.lower()
+        )
+        refreshed = self.catalog.refresh(sorted(filepaths))
+        summary = self.catalog.summarize(username, start_year, end_year, refreshed['archives'])
+        stats['total_games'] = summary['games']
+        stats['total_bytes'] = summary['bytes']
         
         return stats
 
 
-def main():
-    """Main function to handle command line execution."""
+def main(argv: Optional[List[str]] = None):
+    """
+    Main function to handle command line execution.
+    
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+    """
     parser = argparse.ArgumentParser(description='Fetch chess games from Chess.com API')
     parser.add_argument('--user', required=True, help='Chess.com username')
     parser.add_argument('--data-dir', default='data/raw', help='Directory to save raw data')
@@ -230,7 +236,7 @@ def main():
     parser.add_argument('--end-year', type=int, help='End year for data collection')
     parser.add_argument('--log-level', default='INFO', help='Logging level')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Setup logging
     setup_logging(args.log_level)
@@ -250,6 +256,7 @@ def main():
     logging.info(f"Archives downloaded: {stats['archives_downloaded']}")
     logging.info(f"Archives skipped: {stats['archives_skipped']}")
     logging.info(f"Total games: {stats['total_games']}")
+    logging.info(f"Total size: {stats['total_bytes'] / (1024 * 1024):.1f} MB")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+"""
+Lease module.
+Exclusive, expiring claims on named resources held as files in a shared
+directory (local or NFS). Used to distribute shards between workers and to
+serialize writers of the archive catalog.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional
+
+
+class LeaseLostError(Exception):
+    """Raised when a lease was reclaimed by another worker while still in use."""
+
+
+class Lease:
+    """An exclusive, expiring claim on a shard, renewed by a heartbeat thread."""
+
+    def __init__(self, path: str, owner: str, ttl: float):
+        """
+        Initialize the lease.
+
+        Args:
+            path: Path to the lease file
+            owner: Unique token of the owning worker
+            ttl: Seconds without a heartbeat after which the lease expires
+        """
+        self.path = path
+        self.owner = owner
+        self.ttl = ttl
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+
+    def __enter__(self) -> 'Lease':
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def is_owned(self) -> bool:
+        """Check that the lease file still belongs to this worker."""
+        info = load_lease_info(self.path)
+        return info is not None and info.get('owner') == self.owner
+
+    def check(self) -> None:
+        """
+        Make sure the lease is still held before publishing results.
+
+        Raises:
+            LeaseLostError: If the lease expired and was taken over
+        """
+        if self.lost or not self.is_owned():
+            self.lost = True
+            raise LeaseLostError(f"Lease {os.path.basename(self.path)} was taken over by another worker")
+
+    def _heartbeat(self) -> None:
+        """Touch the lease file periodically so it does not expire."""
+        while not self._stop.wait(self.ttl / 3):
+            if not self.is_owned():
+                logging.warning(f"Lost lease {os.path.basename(self.path)}")
+                self.lost = True
+                return
+            try:
+                os.utime(self.path)
+            except OSError as e:
+                logging.warning(f"Could not renew lease {self.path}: {e}")
+
+    def release(self) -> None:
+        """Stop the heartbeat and remove the lease file if still owned."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self.is_owned():
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def load_lease_info(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a lease file without logging errors for missing or half-written files.
+
+    Args:
+        path: Path to the lease file
+
+    Returns:
+        Lease contents or None if unavailable
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class LeaseManager:
+    """Creates, expires and reclaims shard leases in a shared directory."""
+
+    def __init__(self, lease_dir: str, ttl: float = 300.0):
+        """
+        Initialize the lease manager.
+
+        Args:
+            lease_dir: Directory holding the lease files
+            ttl: Seconds without a heartbeat after which a lease is reclaimed
+        """
+        self.lease_dir = lease_dir
+        self.ttl = ttl
+        os.makedirs(lease_dir, exist_ok=True)
+
+    def get_lease_path(self, shard_id: str) -> str:
+        """Get the lease file path for a shard."""
+        return os.path.join(self.lease_dir, f"{shard_id}.lease")
+
+    def acquire(self, shard_id: str, owner: str) -> Optional[Lease]:
+        """
+        Try to claim a shard.
+
+        The lease contents are written to a temporary file which is then
+        hard-linked into place; link() fails if the lease exists and is
+        atomic on local filesystems and NFS, and a lease file is never seen
+        empty. Expiry is judged from the file mtime, which on a shared
+        filesystem is set by the server, so worker clocks only need to be
+        roughly in sync.
+
+        Args:
+            shard_id: Shard to claim
+            owner: Unique token of the claiming worker
+
+        Returns:
+            Lease if the shard was claimed, None if another worker holds it
+        """
+        path = self.get_lease_path(shard_id)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'owner': owner,
+                'host': socket.gethostname(),
+                'pid': os.getpid(),
+                'acquired_at': time.time()
+            }, f)
+
+        try:
+            for _ in range(2):
+                try:
+                    os.link(tmp_path, path)
+                except FileExistsError:
+                    if not self._reclaim_if_expired(path):
+                        return None
+                    continue
+                return Lease(path, owner, self.ttl)
+            return None
+        finally:
+            os.remove(tmp_path)
+
+    def _reclaim_if_expired(self, path: str) -> bool:
+        """
+        Remove a lease whose owner stopped renewing it.
+
+        Unreadable leases (e.g. left half-written by an older worker that
+        crashed) expire like any other once they are older than the TTL.
+
+        Args:
+            path: Path to the lease file
+
+        Returns:
+            True if the lease is gone and the shard may be claimed again
+        """
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except FileNotFoundError:
+            return True
+
+        if age < self.ttl:
+            return False
+
+        stale = load_lease_info(path) or {}
+
+        # Rename first so only one reclaiming worker can win the race
+        graveyard = f"{path}.{uuid.uuid4().hex}.expired"
+        try:
+            os.rename(path, graveyard)
+        except FileNotFoundError:
+            return True
+
+        try:
+            moved_age = time.time() - os.path.getmtime(graveyard)
+        except FileNotFoundError:
+            return True
+        moved = load_lease_info(graveyard) or {}
+        if moved_age < self.ttl or moved.get('owner') != stale.get('owner'):
+            # Another worker reclaimed and re-leased the shard between our
+            # check and the rename: put its fresh lease back
+            try:
+                os.link(graveyard, path)
+            except FileExistsError:
+                pass
+            os.remove(graveyard)
+            return False
+
+        os.remove(graveyard)
+        logging.warning(
+            f"Reclaimed expired lease {os.path.basename(path)} "
+            f"from {stale.get('host')}:{stale.get('pid')}"
+        )
+        return True
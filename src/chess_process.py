@@ -6,25 +6,187 @@ Processes raw JSON game data and creates a clean CSV dataset.
 import logging
 import os
 import pandas as pd
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterable
 
-from utils import setup_logging, load_json_safely, save_csv_safely, parse_pgn_game, list_json_files, validate_chess_data
+from chess_catalog import ArchiveCatalog
+from chess_stats import StreamingStats, get_stats_path
+from utils import setup_logging, load_json_safely, save_csv_safely, parse_pgn_game, list_json_files, validate_chess_data, parse_archive_filename
+
+
+def classify_time_control(time_control: str) -> str:
+    """
+    Determine the game type from a Chess.com time control string.
+    
+    Args:
+        time_control: Time control like "600", "180+2" or "1/86400"
+        
+    Returns:
+        One of bullet, blitz, rapid, daily or unknown
+    """
+    try:
+        # Handle standard formats like "600" or "600+0"
+        base_time = int(time_control.split('+')[0])
+        if base_time <= 180:
+            return 'bullet'
+        elif base_time <= 600:
+            return 'blitz'
+        else:
+            return 'rapid'
+    except:
+        # Handle daily (e.g., "1/86400") or others
+        if '/' in str(time_control):
+            return 'daily'
+        else:
+            return 'unknown'
+
+
+class GameFilter:
+    """
+    Selects a slice of the raw data as early as possible.
+    
+    Files are pruned by their username_YYYY_MM name and games are rejected on
+    raw fields before validation and PGN parsing. Dates are compared in local
+    time, like the end_date column.
+    """
+    
+    def __init__(self, users: Optional[Iterable[str]] = None, start_date: Optional[str] = None,
+                 end_date: Optional[str] = None, game_types: Optional[Iterable[str]] = None,
+                 time_controls: Optional[Iterable[str]] = None, min_rating: Optional[int] = None,
+                 max_rating: Optional[int] = None):
+        """
+        Initialize the filter. Every criterion is optional.
+        
+        Args:
+            users: Keep games played by any of these users (case-insensitive)
+            start_date: Keep games ending on or after this date (YYYY-MM-DD)
+            end_date: Keep games ending on or before this date (YYYY-MM-DD)
+            game_types: Keep games of these types (bullet, blitz, rapid, daily)
+            time_controls: Keep games with exactly these time controls
+            min_rating: Keep games where both players are rated at least this
+            max_rating: Keep games where both players are rated at most this
+        """
+        self.users = {u.lower() for u in users} if users else None
+        self.start = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+        self.end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1) if end_date else None
+        self.start_time = self.start.timestamp() if self.start else None
+        self.end_time = self.end.timestamp() if self.end else None
+        self.game_types = set(game_types) if game_types else None
+        self.time_controls = set(time_controls) if time_controls else None
+        self.min_rating = min_rating
+        self.max_rating = max_rating
+    
+    def select_files(self, filepaths: List[str]) -> List[str]:
+        """
+        Drop raw archives that certainly hold no selected games, from their names alone.
+        
+        Another user's archive is only dropped for a month in which every
+        selected user has an archive of their own, since that archive then
+        holds all of their games for the month. Otherwise games involving a
+        selected user may only exist in the other player's archive.
+        
+        Args:
+            filepaths: Paths to raw JSON files
+            
+        Returns:
+            The paths that may hold selected games, in the original order
+        """
+        parsed = {fp: parse_archive_filename(fp) for fp in filepaths}
+        
+        covered_months = None
+        if self.users:
+            months_by_user = {user: set() for user in self.users}
+            for name in parsed.values():
+                if name and name[0].lower() in months_by_user:
+                    months_by_user[name[0].lower()].add((name[1], name[2]))
+            covered_months = set.intersection(*months_by_user.values())
+        
+        selected = []
+        for filepath in filepaths:
+            name = parsed[filepath]
+            if name is None:
+                selected.append(filepath)
+                continue
+            user, year, month = name
+            if covered_months is not None and user.lower() not in self.users \
+                    and (year, month) in covered_months:
+                continue
+            if self._month_in_range(year, month):
+                selected.append(filepath)
+        
+        return selected
+    
+    def _month_in_range(self, year: int, month: int) -> bool:
+        """Check whether a monthly archive can hold games in the date range."""
+        # Archives are grouped by UTC month; allow a day either side for time zones
+        month_start = datetime(year, month, 1) - timedelta(days=1)
+        month_end = datetime(year + month // 12, month % 12 + 1, 1) + timedelta(days=1)
+        if self.start and month_end <= self.start:
+            return False
+        if self.end and month_start >= self.end:
+            return False
+        
+        return True
+    
+    def accepts_game(self, game: Dict[str, Any]) -> bool:
+        """
+        Check a raw game record using only cheap fields.
+        
+        Args:
+            game: Raw game data from Chess.com API
+            
+        Returns:
+            True if the game is selected
+        """
+        white = game.get('white') or {}
+        black = game.get('black') or {}
+        
+        if self.users and str(white.get('username') or '').lower() not in self.users \
+                and str(black.get('username') or '').lower() not in self.users:
+            return False
+        
+        end_time = game.get('end_time') or 0
+        if self.start_time is not None and end_time < self.start_time:
+            return False
+        if self.end_time is not None and end_time >= self.end_time:
+            return False
+        
+        time_control = game.get('time_control') or ''
+        if self.time_controls and time_control not in self.time_controls:
+            return False
+        if self.game_types and classify_time_control(time_control) not in self.game_types:
+            return False
+        
+        for rating in (white.get('rating') or 0, black.get('rating') or 0):
+            if self.min_rating is not None and rating < self.min_rating:
+                return False
+            if self.max_rating is not None and rating > self.max_rating:
+                return False
+        
+        return True
 
 
 class ChessProcessor:
     """Processes raw chess game data into structured format."""
     
-    def __init__(self, raw_data_dir: str = 'data/raw', processed_data_dir: str = 'data/processed'):
+    def __init__(self, raw_data_dir: str = 'data/raw', processed_data_dir: str = 'data/processed',
+                 game_filter: Optional[GameFilter] = None):
         """
         Initialize the chess processor.
         
         Args:
             raw_data_dir: Directory containing raw JSON files
             processed_data_dir: Directory for processed output
+            game_filter: Optional filter applied before games are extracted
         """
         self.raw_data_dir = raw_data_dir
         self.processed_data_dir = processed_data_dir
+        self.game_filter = game_filter
+        self.stats = StreamingStats()
+        self.catalog = ArchiveCatalog(raw_data_dir)
+        # Archives to (re)catalog while processing, and the entries built for them
+        self.uncataloged = set()
+        self.catalog_updates = {}
         
     def extract_game_data(self, game: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -77,22 +239,7 @@ class ChessProcessor:
             extracted['rating_diff'] = extracted['white_rating'] - extracted['black_rating']
             
             # Determine Game Type from time_control
-            time_control = extracted['time_control']
-            try:
-                # Handle standard formats like "600" or "600+0"
-                base_time = int(time_control.split('+')[0])
-                if base_time <= 180:
-                    extracted['game_type'] = 'bullet'
-                elif base_time <= 600:
-                    extracted['game_type'] = 'blitz'
-                else:
-                    extracted['game_type'] = 'rapid'
-            except:
-                # Handle daily (e.g., "1/86400") or others
-                if '/' in str(time_control):
-                    extracted['game_type'] = 'daily'
-                else:
-                    extracted['game_type'] = 'unknown'
+            extracted['game_type'] = classify_time_control(extracted['time_control'])
             
             # Parse PGN for additional information
             if extracted['pgn']:
@@ -159,10 +306,19 @@ class ChessProcessor:
         if not data:
             return []
         
+        # Catalog the archive from the data already in memory
+        if os.path.basename(filepath) in self.uncataloged:
+            entry = self.catalog.describe_archive(filepath, data)
+            if entry is not None:
+                self.catalog_updates[os.path.basename(filepath)] = entry
+        
         games = data.get('games', [])
         processed_games = []
         
         for game in games:
+            # Reject unwanted games before validation and PGN parsing
+            if self.game_filter and not self.game_filter.accepts_game(game):
+                continue
             extracted = self.extract_game_data(game)
             if extracted:
                 processed_games.append(extracted)
@@ -170,6 +326,41 @@ class ChessProcessor:
         logging.info(f"Processed {len(processed_games)} games from {os.path.basename(filepath)}")
         return processed_games
     
+    def plan_files(self) -> Dict[str, Any]:
+        """
+        Select the raw files to process and describe them from the archive catalog.
+        
+        This only reads the catalog and stats the selected files; archives
+        missing from the catalog (or changed on disk) are cataloged while
+        they are processed.
+        
+        Returns:
+            Dictionary with the selected file paths, the number of files on
+            disk, the selected files' total size, the game count and end_time
+            range of those already cataloged, and the uncataloged file names
+        """
+        all_files = list_json_files(self.raw_data_dir)
+        json_files = all_files
+        if self.game_filter:
+            json_files = self.game_filter.select_files(all_files)
+        
+        archives = self.catalog.load()
+        uncataloged = [fp for fp in json_files if self.catalog.is_stale(fp, archives)]
+        stale = set(uncataloged)
+        entries = [archives[os.path.basename(fp)] for fp in json_files if fp not in stale]
+        min_times = [e['min_end_time'] for e in entries if e.get('min_end_time') is not None]
+        max_times = [e['max_end_time'] for e in entries if e.get('max_end_time') is not None]
+        
+        return {
+            'files': json_files,
+            'total_files': len(all_files),
+            'bytes': sum(e['bytes'] for e in entries) + sum(os.path.getsize(fp) for fp in uncataloged),
+            'games': sum(e['games'] for e in entries),
+            'min_end_time': min(min_times) if min_times else None,
+            'max_end_time': max(max_times) if max_times else None,
+            'uncataloged': [os.path.basename(fp) for fp in uncataloged]
+        }
+    
     def process_all_files(self) -> pd.DataFrame:
         """
         Process all JSON files in the raw data directory.
@@ -178,18 +369,51 @@ class ChessProcessor:
             DataFrame with all processed game data
         """
         all_games = []
-        json_files = list_json_files(self.raw_data_dir)
+        seen_urls = set()
+        self.stats = StreamingStats()
+        plan = self.plan_files()
+        json_files = plan['files']
         
-        if not json_files:
+        if not plan['total_files']:
             logging.warning(f"No JSON files found in {self.raw_data_dir}")
             return pd.DataFrame()
         
-        logging.info(f"Processing {len(json_files)} JSON files...")
+        if self.game_filter:
+            logging.info(f"Filter selected {len(json_files)} of {plan['total_files']} JSON files")
+        
+        logging.info(f"Processing {len(json_files)} JSON files "
+                     f"({plan['bytes'] / (1024 * 1024):.1f} MB, {plan['games']} cataloged games, "
+                     f"{len(plan['uncataloged'])} archives not yet cataloged)...")
+        
+        self.uncataloged = set(plan['uncataloged'])
+        self.catalog_updates = {}
         
         for filepath in json_files:
             games = self.process_json_file(filepath)
             all_games.extend(games)
+            
+            # Feed summary statistics once per unique game, as kept by build_dataframe
+            for game in games:
+                if game['url'] not in seen_urls:
+                    seen_urls.add(game['url'])
+                    self.stats.update(game)
+        
+        # Best effort: the raw directory may be read-only
+        if self.catalog_updates and self.catalog.update(self.catalog_updates):
+            logging.info(f"Cataloged {len(self.catalog_updates)} archives")
+        
+        return self.build_dataframe(all_games)
+    
+    def build_dataframe(self, all_games: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Build the deduplicated, time-ordered DataFrame from extracted games.
         
+        Args:
+            all_games: Extracted game records, possibly from several files
+            
+        Returns:
+            DataFrame with unique games sorted by end_time
+        """
         if not all_games:
             logging.warning("No games extracted from any files")
             return pd.DataFrame()
@@ -222,9 +446,32 @@ class ChessProcessor:
             True if successful, False otherwise
         """
         try:
+            # Report archives that arrived since the previous dataset was written
+            output_path = os.path.join(self.processed_data_dir, output_filename)
+            if os.path.exists(output_path):
+                changed = self.catalog.changed_since(os.path.getmtime(output_path))
+                logging.info(f"{len(changed)} archives new or changed since the last dataset")
+            
             # Process all raw data files
             df = self.process_all_files()
+            return self.save_dataset(df, output_filename)
             
+        except Exception as e:
+            logging.error(f"Error creating processed dataset: {e}")
+            return False
+    
+    def save_dataset(self, df: pd.DataFrame, output_filename: str = 'processed.csv') -> bool:
+        """
+        Order columns, drop the PGN text and save the dataset as CSV.
+        
+        Args:
+            df: DataFrame produced by build_dataframe
+            output_filename: Name of output CSV file
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
             if df.empty:
                 logging.error("No data to save - DataFrame is empty")
                 return False
@@ -260,39 +507,81 @@ class ChessProcessor:
                 logging.info(f"Dataset shape: {df.shape}")
                 logging.info(f"Date range: {df['end_date'].min()} to {df['end_date'].max()}")
                 
-                # Print some basic stats
+                # Print some basic stats from the streaming sketches
+                summary = self.stats.summary()
                 logging.info("\nDataset Summary:")
                 logging.info(f"Total games: {len(df)}")
-                logging.info(f"Unique players: {len(set(df['white_username'].tolist() + df['black_username'].tolist()))}")
-                logging.info(f"Date range: {df['end_date'].min()} to {df['end_date'].max()}")
+                logging.info(f"Unique players (approx.): {summary['unique_players']}")
+                logging.info(f"Rating quartiles: {summary['rating']}")
+                logging.info(f"Time controls: {summary['time_control']}")
+                logging.info(f"Top openings: {summary['opening_name']}")
                 
-                if 'time_control' in df.columns:
-                    logging.info(f"Time controls: {df['time_control'].value_counts().head().to_dict()}")
+                stats_path = get_stats_path(output_path)
+                if not self.stats.save(stats_path):
+                    logging.warning(f"Could not write summary statistics to {stats_path}")
             
             return success
             
         except Exception as e:
-            logging.error(f"Error creating processed dataset: {e}")
+            logging.error(f"Error saving processed dataset: {e}")
             return False
 
 
-def main():
-    """Main function to handle command line execution."""
+def parse_date_argument(value: str) -> str:
+    """
+    Validate a YYYY-MM-DD command line date.
+    
+    Args:
+        value: Date string from the command line
+        
+    Returns:
+        The unchanged date string
+    """
+    import argparse
+    
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+    return value
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main function to handle command line execution.
+    
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+    """
     import argparse
     
     parser = argparse.ArgumentParser(description='Process raw chess game data into CSV')
     parser.add_argument('--raw-dir', default='data/raw', help='Directory containing raw JSON files')
     parser.add_argument('--processed-dir', default='data/processed', help='Directory for processed output')
     parser.add_argument('--output', default='processed.csv', help='Output CSV filename')
+    parser.add_argument('--users', nargs='+', help='Only include games played by these users')
+    parser.add_argument('--start-date', type=parse_date_argument, help='Only include games ending on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=parse_date_argument, help='Only include games ending on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--game-types', nargs='+', choices=['bullet', 'blitz', 'rapid', 'daily', 'unknown'],
+                        help='Only include these game types')
+    parser.add_argument('--time-controls', nargs='+', help='Only include these exact time controls (e.g. 180+2)')
+    parser.add_argument('--min-rating', type=int, help='Only include games where both players are rated at least this')
+    parser.add_argument('--max-rating', type=int, help='Only include games where both players are rated at most this')
     parser.add_argument('--log-level', default='INFO', help='Logging level')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Setup logging
     setup_logging(args.log_level)
     
+    game_filter = None
+    if any([args.users, args.start_date, args.end_date, args.game_types, args.time_controls,
+            args.min_rating is not None, args.max_rating is not None]):
+        game_filter = GameFilter(args.users, args.start_date, args.end_date, args.game_types,
+                                 args.time_controls, args.min_rating, args.max_rating)
+    
     # Create processor and process data
-    processor = ChessProcessor(args.raw_dir, args.processed_dir)
+    processor = ChessProcessor(args.raw_dir, args.processed_dir, game_filter)
     
     logging.info("Starting chess data processing...")
     success = processor.create_processed_dataset(args.output)
@@ -0,0 +1,422 @@
+"""
+Streaming statistics module.
+Constant-memory, mergeable sketches fed game by game during extraction:
+HyperLogLog for distinct players, relative-error quantile sketches for
+ratings, rating difference and move count, and Misra-Gries heavy hitters
+for openings and time controls. All sketches serialize to JSON so they can
+be combined across files, workers and runs.
+"""
+
+import argparse
+import base64
+import hashlib
+import logging
+import math
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils import setup_logging, load_json_safely, save_json_safely
+
+
+class HyperLogLog:
+    """Approximate distinct counter (standard error about 1.04 / sqrt(2**precision))."""
+
+    def __init__(self, precision: int = 14):
+        """
+        Initialize the counter.
+
+        Args:
+            precision: Number of index bits; uses 2**precision one-byte registers
+        """
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = bytearray(self.num_registers)
+
+    def add(self, value: str) -> None:
+        """Add a value to the counter."""
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remaining = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added."""
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # Small range correction (linear counting)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+
+        return int(round(estimate))
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        """Merge another counter with the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog precision {other.precision} into {self.precision}")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the counter."""
+        return {
+            'precision': self.precision,
+            'registers': base64.b64encode(bytes(self.registers)).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HyperLogLog':
+        """Deserialize a counter produced by to_dict."""
+        hll = cls(data['precision'])
+        hll.registers = bytearray(base64.b64decode(data['registers']))
+        return hll
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch-style log buckets)."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """
+        Initialize the sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of returned quantiles
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, value: float) -> int:
+        """Get the bucket index for a positive value."""
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def _value(self, key: int) -> float:
+        """Get the representative value of a bucket."""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float) -> None:
+        """Add a value to the sketch."""
+        if value > 0:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + 1
+        elif value < 0:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + 1
+        else:
+            self.zero_count += 1
+
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value or None if the sketch is empty
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        value = self.max
+
+        buckets: List[Tuple[float, int]] = (
+            [(-self._value(k), self.negative[k]) for k in sorted(self.negative, reverse=True)]
+            + [(0.0, self.zero_count)]
+            + [(self._value(k), self.positive[k]) for k in sorted(self.positive)]
+        )
+        for bucket_value, bucket_count in buckets:
+            seen += bucket_count
+            if seen > rank:
+                value = bucket_value
+                break
+
+        return min(max(value, self.min), self.max)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Merge another sketch with the same accuracy into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge quantile sketches with different accuracy")
+        for key, count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + count
+        for key, count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch."""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': {str(k): v for k, v in self.positive.items()},
+            'negative': {str(k): v for k, v in self.negative.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        """Deserialize a sketch produced by to_dict."""
+        sketch = cls(data['relative_accuracy'])
+        sketch.positive = {int(k): v for k, v in data['positive'].items()}
+        sketch.negative = {int(k): v for k, v in data['negative'].items()}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        return sketch
+
+
+class HeavyHitters:
+    """Misra-Gries frequent items summary; counts undercount by at most total / (capacity + 1)."""
+
+    def __init__(self, capacity: int = 64):
+        """
+        Initialize the summary.
+
+        Args:
+            capacity: Maximum number of tracked items
+        """
+        self.capacity = capacity
+        self.counters: Dict[str, int] = {}
+        self.total = 0
+
+    def add(self, item: str, count: int = 1) -> None:
+        """Add occurrences of an item."""
+        self.total += count
+        self.counters[item] = self.counters.get(item, 0) + count
+        if len(self.counters) > self.capacity:
+            self._shrink()
+
+    def _shrink(self) -> None:
+        """Subtract the (capacity + 1)-th largest count and drop non-positive counters."""
+        threshold = sorted(self.counters.values(), reverse=True)[self.capacity]
+        self.counters = {item: c - threshold for item, c in self.counters.items() if c > threshold}
+
+    def top(self, n: int = 5) -> Dict[str, int]:
+        """Get the n most frequent items with their (lower-bound) counts."""
+        ranked = sorted(self.counters.items(), key=lambda kv: (-kv[1], kv[0]))
+        return dict(ranked[:n])
+
+    def merge(self, other: 'HeavyHitters') -> None:
+        """Merge another summary into this one."""
+        self.total += other.total
+        for item, count in other.counters.items():
+            self.counters[item] = self.counters.get(item, 0) + count
+        if len(self.counters) > self.capacity:
+            self._shrink()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the summary."""
+        return {'capacity': self.capacity, 'counters': dict(self.counters), 'total': self.total}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HeavyHitters':
+        """Deserialize a summary produced by to_dict."""
+        summary = cls(data['capacity'])
+        summary.counters = dict(data['counters'])
+        summary.total = data['total']
+        return summary
+
+
+class StreamingStats:
+    """Dataset summary statistics maintained game by game in constant memory."""
+
+    QUANTILE_FIELDS = ['rating', 'rating_diff', 'move_count']
+    HEAVY_HITTER_FIELDS = ['opening_name', 'time_control']
+
+    def __init__(self):
+        """Initialize empty sketches."""
+        self.games = 0
+        self.min_end_time: Optional[int] = None
+        self.max_end_time: Optional[int] = None
+        self.players = HyperLogLog()
+        self.quantiles = {field: QuantileSketch() for field in self.QUANTILE_FIELDS}
+        self.heavy_hitters = {field: HeavyHitters() for field in self.HEAVY_HITTER_FIELDS}
+
+    def update(self, game: Dict[str, Any]) -> None:
+        """
+        Feed one extracted game record.
+
+        Args:
+            game: Game record as returned by ChessProcessor.extract_game_data
+        """
+        self.games += 1
+
+        end_time = game.get('end_time')
+        if end_time:
+            self.min_end_time = end_time if self.min_end_time is None else min(self.min_end_time, end_time)
+            self.max_end_time = end_time if self.max_end_time is None else max(self.max_end_time, end_time)
+
+        for side in ('white', 'black'):
+            username = game.get(f'{side}_username')
+            if username:
+                self.players.add(username.lower())
+            rating = game.get(f'{side}_rating')
+            if rating:
+                self.quantiles['rating'].add(rating)
+
+        for field in ('rating_diff', 'move_count'):
+            value = game.get(field)
+            if value is not None:
+                self.quantiles[field].add(value)
+
+        for field in self.HEAVY_HITTER_FIELDS:
+            value = game.get(field)
+            if value:
+                self.heavy_hitters[field].add(value)
+
+    def merge(self, other: 'StreamingStats') -> None:
+        """Merge statistics from another file, worker or run into this one."""
+        self.games += other.games
+        if other.min_end_time is not None:
+            self.min_end_time = other.min_end_time if self.min_end_time is None else min(self.min_end_time, other.min_end_time)
+        if other.max_end_time is not None:
+            self.max_end_time = other.max_end_time if self.max_end_time is None else max(self.max_end_time, other.max_end_time)
+        self.players.merge(other.players)
+        for field, sketch in other.quantiles.items():
+            self.quantiles[field].merge(sketch)
+        for field, summary in other.heavy_hitters.items():
+            self.heavy_hitters[field].merge(summary)
+
+    def summary(self, top_n: int = 5) -> Dict[str, Any]:
+        """
+        Get a human-readable summary.
+
+        Args:
+            top_n: Number of heavy hitters to report per field
+
+        Returns:
+            Dictionary of summary values
+        """
+        result = {
+            'games': self.games,
+            'unique_players': self.players.count(),
+            'min_end_time': self.min_end_time,
+            'max_end_time': self.max_end_time
+        }
+        for field, sketch in self.quantiles.items():
+            # All tracked fields are integers; bucket midpoints are not
+            result[field] = {
+                name: round(value) if value is not None else None
+                for name, value in (
+                    ('min', sketch.min),
+                    ('p25', sketch.quantile(0.25)),
+                    ('median', sketch.quantile(0.5)),
+                    ('p75', sketch.quantile(0.75)),
+                    ('max', sketch.max)
+                )
+            }
+        for field, summary in self.heavy_hitters.items():
+            result[field] = summary.top(top_n)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize all sketches."""
+        return {
+            'games': self.games,
+            'min_end_time': self.min_end_time,
+            'max_end_time': self.max_end_time,
+            'players': self.players.to_dict(),
+            'quantiles': {field: sketch.to_dict() for field, sketch in self.quantiles.items()},
+            'heavy_hitters': {field: summary.to_dict() for field, summary in self.heavy_hitters.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StreamingStats':
+        """Deserialize statistics produced by to_dict."""
+        stats = cls()
+        stats.games = data['games']
+        stats.min_end_time = data['min_end_time']
+        stats.max_end_time = data['max_end_time']
+        stats.players = HyperLogLog.from_dict(data['players'])
+        stats.quantiles.update({field: QuantileSketch.from_dict(d) for field, d in data['quantiles'].items()})
+        stats.heavy_hitters.update({field: HeavyHitters.from_dict(d) for field, d in data['heavy_hitters'].items()})
+        return stats
+
+    def save(self, filepath: str) -> bool:
+        """Save the sketches to a JSON file."""
+        return save_json_safely(self.to_dict(), filepath)
+
+    @classmethod
+    def load(cls, filepath: str) -> Optional['StreamingStats']:
+        """Load sketches from a JSON file, or None if unavailable."""
+        data = load_json_safely(filepath)
+        if data is None:
+            return None
+        try:
+            return cls.from_dict(data)
+        except (KeyError, TypeError, ValueError) as e:
+            logging.error(f"Invalid statistics file {filepath}: {e}")
+            return None
+
+
+def get_stats_path(csv_path: str) -> str:
+    """
+    Get the statistics sidecar path for a processed CSV file.
+
+    Args:
+        csv_path: Path to processed CSV
+
+    Returns:
+        Path like processed.stats.json
+    """
+    return f"{csv_path.rsplit('.', 1)[0]}.stats.json"
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main function to handle command line execution.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description='Summarize and merge streaming statistics files')
+    parser.add_argument('files', nargs='*', default=['data/processed/processed.stats.json'],
+                        help='Statistics files to merge and summarize')
+    parser.add_argument('--output', help='Save the merged statistics to this file')
+    parser.add_argument('--top', type=int, default=5, help='Number of top openings/time controls to show')
+    parser.add_argument('--log-level', default='INFO', help='Logging level')
+
+    args = parser.parse_args(argv)
+
+    # Setup logging
+    setup_logging(args.log_level)
+
+    merged = StreamingStats()
+    for filepath in args.files:
+        stats = StreamingStats.load(filepath)
+        if stats is None:
+            exit(1)
+        merged.merge(stats)
+
+    if args.output and not merged.save(args.output):
+        exit(1)
+
+    for key, value in merged.summary(args.top).items():
+        logging.info(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
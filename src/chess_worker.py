@@ -0,0 +1,336 @@
+"""
+Distributed chess data processing module.
+Lets several workers, on one machine or on hosts sharing the raw data
+directory (e.g. over NFS), split the raw JSON files between them using
+lease files, and merges the per-shard results into the final CSV dataset.
+
+Layout of the work directory:
+    leases/<shard>.lease   held by the worker currently processing a shard
+    shards/<shard>.json    extracted games for one raw file
+    done/<shard>.json      completion marker for a shard
+"""
+
+import argparse
+import logging
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from chess_catalog import ArchiveCatalog
+from chess_leases import Lease, LeaseLostError, LeaseManager
+from chess_stats import StreamingStats
+from utils import setup_logging, load_json_safely, save_json_safely, list_json_files
+
+
+def get_shard_id(filepath: str) -> str:
+    """
+    Get the shard identifier for a raw JSON file.
+
+    Args:
+        filepath: Path to raw JSON file
+
+    Returns:
+        File name without the .json extension
+    """
+    return os.path.splitext(os.path.basename(filepath))[0]
+
+
+def get_source_signature(filepath: str) -> Dict[str, int]:
+    """
+    Describe a raw file so that a re-downloaded file is processed again.
+
+    Args:
+        filepath: Path to raw JSON file
+
+    Returns:
+        Dictionary with the file size and modification time
+    """
+    stat = os.stat(filepath)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class DistributedWorker:
+    """Claims raw files through leases and processes them into per-shard outputs."""
+
+    def __init__(self, raw_data_dir: str = 'data/raw', work_dir: str = 'data/work',
+                 worker_id: str = None, lease_ttl: float = 300.0):
+        """
+        Initialize the distributed worker.
+
+        Args:
+            raw_data_dir: Directory containing raw JSON files
+            work_dir: Shared directory for leases, shard outputs and markers
+            worker_id: Unique worker token (defaults to host, pid and a random suffix)
+            lease_ttl: Seconds without a heartbeat after which a lease is reclaimed
+        """
+        self.raw_data_dir = raw_data_dir
+        self.work_dir = work_dir
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.shard_dir = os.path.join(work_dir, 'shards')
+        self.done_dir = os.path.join(work_dir, 'done')
+        self.leases = LeaseManager(os.path.join(work_dir, 'leases'), lease_ttl)
+
+    def get_shard_path(self, shard_id: str) -> str:
+        """Get the output path for a shard."""
+        return os.path.join(self.shard_dir, f"{shard_id}.json")
+
+    def get_marker_path(self, shard_id: str) -> str:
+        """Get the completion marker path for a shard."""
+        return os.path.join(self.done_dir, f"{shard_id}.json")
+
+    def is_done(self, filepath: str) -> bool:
+        """
+        Check whether a raw file has a completion marker matching its current contents.
+
+        Args:
+            filepath: Path to raw JSON file
+
+        Returns:
+            True if the shard is already processed
+        """
+        marker_path = self.get_marker_path(get_shard_id(filepath))
+        if not os.path.exists(marker_path):
+            return False
+        marker = load_json_safely(marker_path)
+        try:
+            return marker is not None and marker.get('source') == get_source_signature(filepath)
+        except OSError:
+            return False
+
+    def process_shard(self, filepath: str, lease: Optional[Lease] = None) -> int:
+        """
+        Extract one raw file and publish its shard output and completion marker.
+
+        Nothing is published once the lease has been taken over by another
+        worker; outputs are written atomically in any case.
+
+        Args:
+            filepath: Path to raw JSON file
+            lease: Lease held on the shard, checked before each write
+
+        Returns:
+            Number of games written to the shard
+
+        Raises:
+            LeaseLostError: If the lease was taken over during processing
+        """
+        from chess_process import ChessProcessor
+
+        shard_id = get_shard_id(filepath)
+        signature = get_source_signature(filepath)
+
+        games = ChessProcessor(self.raw_data_dir).process_json_file(filepath)
+        for game in games:
+            game.pop('pgn', None)
+
+        if lease is not None:
+            lease.check()
+        if not save_json_safely({'source_file': os.path.basename(filepath), 'games': games},
+                                self.get_shard_path(shard_id)):
+            raise IOError(f"Could not write shard output for {shard_id}")
+
+        if lease is not None:
+            lease.check()
+        if not save_json_safely({
+            'source_file': os.path.basename(filepath),
+            'source': signature,
+            'games': len(games),
+            'worker': self.worker_id,
+            'completed_at': time.time()
+        }, self.get_marker_path(shard_id)):
+            raise IOError(f"Could not write completion marker for {shard_id}")
+
+        return len(games)
+
+    def run(self, wait: bool = False, poll_interval: float = 5.0) -> Dict[str, int]:
+        """
+        Claim and process raw files until none are left to claim.
+
+        Args:
+            wait: Keep polling until every shard is done, so that leases of
+                crashed workers are picked up once they expire
+            poll_interval: Seconds between passes when waiting
+
+        Returns:
+            Dictionary with processing statistics
+        """
+        stats = {
+            'shards_processed': 0,
+            'shards_failed': 0,
+            'games': 0
+        }
+
+        # Claim the largest archives first so the last shards finish close together
+        archives = ArchiveCatalog(self.raw_data_dir).load()
+
+        def archive_size(filepath: str) -> int:
+            entry = archives.get(os.path.basename(filepath))
+            if entry is not None:
+                return entry['bytes']
+            try:
+                return os.path.getsize(filepath)
+            except OSError:
+                return 0
+
+        while True:
+            pending = 0
+            for filepath in sorted(list_json_files(self.raw_data_dir), key=archive_size, reverse=True):
+                if self.is_done(filepath):
+                    continue
+
+                shard_id = get_shard_id(filepath)
+                try:
+                    lease = self.leases.acquire(shard_id, self.worker_id)
+                except OSError as e:
+                    # E.g. a transient error on a shared file system; retry on the next pass
+                    logging.warning(f"Could not acquire lease for {shard_id}: {e}")
+                    lease = None
+                if lease is None:
+                    pending += 1
+                    continue
+
+                with lease:
+                    # Another worker may have finished it while we were acquiring
+                    if self.is_done(filepath):
+                        continue
+                    try:
+                        stats['games'] += self.process_shard(filepath, lease)
+                        stats['shards_processed'] += 1
+                    except LeaseLostError as e:
+                        logging.warning(f"Abandoning shard {shard_id}: {e}")
+                    except Exception as e:
+                        logging.error(f"Error processing shard {shard_id}: {e}")
+                        stats['shards_failed'] += 1
+
+            if not wait or pending == 0:
+                break
+            logging.info(f"{pending} shards leased by other workers, waiting...")
+            time.sleep(poll_interval)
+
+        logging.info(f"Worker {self.worker_id} processed {stats['shards_processed']} shards "
+                     f"({stats['games']} games, {stats['shards_failed']} failed)")
+        return stats
+
+
+def merge_shards(raw_data_dir: str = 'data/raw', work_dir: str = 'data/work',
+                 processed_data_dir: str = 'data/processed',
+                 output_filename: str = 'processed.csv') -> bool:
+    """
+    Combine completed shard outputs into the final CSV dataset.
+
+    Games are deduplicated globally by url and ordered by end_time, exactly
+    as in a single-process run. Summary statistics are built from the
+    deduplicated games so they match a single-process run too.
+
+    Args:
+        raw_data_dir: Directory containing raw JSON files
+        work_dir: Shared work directory used by the workers
+        processed_data_dir: Directory for processed output
+        output_filename: Name of output CSV file
+
+    Returns:
+        True if successful, False otherwise
+    """
+    from chess_process import ChessProcessor
+
+    worker = DistributedWorker(raw_data_dir, work_dir)
+    all_games = []
+    seen_urls = set()
+    missing = []
+    stats = StreamingStats()
+
+    for filepath in sorted(list_json_files(raw_data_dir)):
+        if not worker.is_done(filepath):
+            missing.append(os.path.basename(filepath))
+            continue
+        shard = load_json_safely(worker.get_shard_path(get_shard_id(filepath)))
+        if shard is None:
+            missing.append(os.path.basename(filepath))
+            continue
+        games = shard.get('games', [])
+        all_games.extend(games)
+
+        # Feed summary statistics once per unique game, as kept by build_dataframe
+        for game in games:
+            if game['url'] not in seen_urls:
+                seen_urls.add(game['url'])
+                stats.update(game)
+
+    if missing:
+        logging.warning(f"{len(missing)} raw files have no completed shard and were not merged: "
+                        f"{', '.join(missing[:5])}{'...' if len(missing) > 5 else ''}")
+
+    processor = ChessProcessor(raw_data_dir, processed_data_dir)
+    processor.stats = stats
+    df = processor.build_dataframe(all_games)
+    return processor.save_dataset(df, output_filename)
+
+
+def _run_local_worker(raw_data_dir: str, work_dir: str, lease_ttl: float,
+                      wait: bool, log_level: str) -> Dict[str, int]:
+    """Entry point for a worker started in a local subprocess."""
+    setup_logging(log_level)
+    return DistributedWorker(raw_data_dir, work_dir, lease_ttl=lease_ttl).run(wait=wait)
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main function to handle command line execution.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description='Process raw chess game data with several coordinated workers')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    work_parser = subparsers.add_parser('work', help='Claim and process raw files')
+    work_parser.add_argument('--workers', type=int, default=1, help='Number of local worker processes')
+    work_parser.add_argument('--worker-id', help='Unique worker id (single worker only)')
+    work_parser.add_argument('--lease-ttl', type=float, default=300.0, help='Seconds before an unrenewed lease is reclaimed')
+    work_parser.add_argument('--wait', action='store_true', help='Wait for shards leased by other workers to finish')
+
+    merge_parser = subparsers.add_parser('merge', help='Merge completed shards into the CSV dataset')
+    merge_parser.add_argument('--processed-dir', default='data/processed', help='Directory for processed output')
+    merge_parser.add_argument('--output', default='processed.csv', help='Output CSV filename')
+
+    for sub in (work_parser, merge_parser):
+        sub.add_argument('--raw-dir', default='data/raw', help='Directory containing raw JSON files')
+        sub.add_argument('--work-dir', default='data/work', help='Shared directory for leases and shard outputs')
+        sub.add_argument('--log-level', default='INFO', help='Logging level')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'work' and args.worker_id and args.workers > 1:
+        parser.error("--worker-id can only be used with a single worker (--workers 1)")
+
+    # Setup logging
+    setup_logging(args.log_level)
+
+    if args.command == 'merge':
+        if not merge_shards(args.raw_dir, args.work_dir, args.processed_dir, args.output):
+            logging.error("Merging shards failed!")
+            exit(1)
+        return
+
+    if args.workers <= 1:
+        DistributedWorker(args.raw_dir, args.work_dir, args.worker_id, args.lease_ttl).run(wait=args.wait)
+        return
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(_run_local_worker, args.raw_dir, args.work_dir,
+                            args.lease_ttl, args.wait, args.log_level)
+            for _ in range(args.workers)
+        ]
+        results = [future.result() for future in futures]
+
+    logging.info(f"All workers finished: {sum(r['shards_processed'] for r in results)} shards, "
+                 f"{sum(r['games'] for r in results)} games, "
+                 f"{sum(r['shards_failed'] for r in results)} failed")
+
+
+if __name__ == "__main__":
+    main()
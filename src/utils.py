@@ -1,24 +1,31 @@
 """
 Utility functions for the chess ETL project.
 Provides safe file operations, JSON handling, CSV operations, and PGN parsing.
+
+pandas and python-chess are only imported by the functions that use them, so
+that commands which never touch a DataFrame or a PGN (e.g. fetching) start fast.
 """
 
 import json
 import logging
 import os
-import pandas as pd
-import chess
-import chess.pgn
+import uuid
 from io import StringIO
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def setup_logging(log_level: str = 'INFO') -> None:
     """Setup logging configuration for the application."""
+    level = getattr(logging, log_level.upper())
     logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
+        level=level,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
+    # basicConfig is a no-op once configured, e.g. for later jobs of a batch
+    logging.getLogger().setLevel(level)
 
 
 def load_json_safely(filepath: str) -> Optional[Dict[str, Any]]:
@@ -49,6 +56,10 @@ def save_json_safely(data: Dict[str, Any], filepath: str) -> bool:
     """
     Safely save data to JSON file with error handling.
     
+    The data is written to a temporary file next to the destination and
+    renamed into place, so readers (possibly on other hosts sharing the
+    directory) never see a partially written file.
+    
     Args:
         data: Data to save
         filepath: Destination file path
@@ -56,17 +67,22 @@ def save_json_safely(data: Dict[str, Any], filepath: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
+    # Unique per writer, even across hosts sharing the directory
+    tmp_path = f"{filepath}.{uuid.uuid4().hex}.tmp"
     try:
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
+        ensure_directory_exists(filepath)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, filepath)
         return True
     except Exception as e:
         logging.error(f"Error saving to {filepath}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
 
 
-def save_csv_safely(df: pd.DataFrame, filepath: str) -> bool:
+def save_csv_safely(df: 'pd.DataFrame', filepath: str) -> bool:
     """
     Safely save DataFrame to CSV with error handling.
     
@@ -106,6 +122,8 @@ def parse_pgn_game(pgn_string: str) -> Dict[str, Any]:
     }
     
     try:
+        import chess.pgn
+        
         # Parse PGN
         pgn_io = StringIO(pgn_string)
         game = chess.pgn.read_game(pgn_io)
@@ -186,7 +204,8 @@ def list_json_files(directory: str) -> List[str]:
     try:
         if os.path.exists(directory):
             for filename in os.listdir(directory):
-                if filename.lower().endswith('.json'):
+                # Hidden files (e.g. the archive catalog) are not game archives
+                if filename.lower().endswith('.json') and not filename.startswith('.'):
                     json_files.append(os.path.join(directory, filename))
     except Exception as e:
         logging.error(f"Error listing JSON files in {directory}: {e}")
@@ -194,6 +213,33 @@ def list_json_files(directory: str) -> List[str]:
     return json_files
 
 
+def parse_archive_filename(filepath: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Parse a raw archive file name of the form username_YYYY_MM.json.
+    
+    Args:
+        filepath: Path or file name of the archive
+        
+    Returns:
+        Tuple of (username, year, month) or None if the name does not match
+        or the month is not 1-12
+    """
+    name = os.path.basename(filepath)
+    if not name.lower().endswith('.json'):
+        return None
+    
+    # Usernames may themselves contain underscores, so split from the right
+    parts = name[:-len('.json')].rsplit('_', 2)
+    if len(parts) != 3 or not parts[1].isdigit() or not parts[2].isdigit():
+        return None
+    
+    year, month = int(parts[1]), int(parts[2])
+    if not 1 <= month <= 12:
+        return None
+    
+    return parts[0], year, month
+
+
 def validate_chess_data(game_data: Dict[str, Any]) -> bool:
     """
     Validate that game data has required fields.
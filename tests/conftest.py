@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+# The modules in src/ are run as scripts and import each other by name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from utils import save_json_safely  # noqa: E402
+
+PGN = '[Event "Live Chess"]\n[ECO "C20"]\n[Result "1-0"]\n\n1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0'
+
+
+def make_game(game_id: int, white: str, black: str, end_time: int) -> dict:
+    return {
+        'url': f"https://www.chess.com/game/live/{game_id}",
+        'pgn': PGN,
+        'time_control': ['60', '180+2', '600', '1/86400'][game_id % 4],
+        'end_time': end_time,
+        'white': {'username': white, 'rating': 1000 + game_id, 'result': 'win'},
+        'black': {'username': black, 'rating': 1500 - game_id, 'result': 'checkmated'}
+    }
+
+
+def write_corpus(raw_dir: str) -> None:
+    """Three users, two months each; games between alice and bob appear in both archives."""
+    game_id = 0
+    for month in (1, 2):
+        base = 1672531200 + (month - 1) * 31 * 86400
+        shared = [make_game(1000 + month * 10 + i, 'alice', 'bob', base + 5000 + i) for i in range(5)]
+        for user in ('alice', 'bob', 'carol'):
+            games = []
+            for i in range(10):
+                game_id += 1
+                games.append(make_game(game_id, user, 'dave', base + game_id * 60))
+            if user in ('alice', 'bob'):
+                games += shared
+            save_json_safely({'games': games}, os.path.join(raw_dir, f"{user}_2023_{month:02d}.json"))
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    path = str(tmp_path / 'raw')
+    write_corpus(path)
+    return path
@@ -0,0 +1,25 @@
+"""Tests for the unified command line entry point."""
+
+import chess_etl
+
+
+def test_batch_reports_missing_jobs_file(tmp_path, capsys):
+    assert chess_etl.run_command(['batch', str(tmp_path / 'missing.txt')]) == 2
+    assert 'cannot read jobs file' in capsys.readouterr().err
+
+
+def test_batch_survives_failing_jobs(tmp_path, monkeypatch):
+    ran = []
+
+    def fake_run_command(argv):
+        ran.append(argv[0])
+        if argv[0] == 'process':
+            raise RuntimeError('boom')
+        return 0
+
+    jobs_file = tmp_path / 'jobs.txt'
+    jobs_file.write_text('# comment\nfetch --user a\nprocess\nstats\n', encoding='utf-8')
+    monkeypatch.setattr(chess_etl, 'run_command', fake_run_command)
+
+    assert chess_etl.run_batch([str(jobs_file)]) == 1
+    assert ran == ['fetch', 'process', 'stats']
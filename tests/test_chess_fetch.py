@@ -0,0 +1,117 @@
+"""Tests for the fetcher's use of the archive catalog."""
+
+import os
+import time
+
+from conftest import make_game
+from chess_catalog import ArchiveCatalog
+from chess_fetch import ChessFetcher
+from utils import save_json_safely
+
+ARCHIVES_URL = "https://api.chess.com/pub/player/alice/games/archives"
+
+
+def archive_url(year: int, month: int) -> str:
+    return f"https://api.chess.com/pub/player/alice/games/{year}/{month:02d}"
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def make_archive(year: int, month: int, count: int) -> dict:
+    base = int(time.mktime((year, month, 2, 0, 0, 0, 0, 0, -1)))
+    return {'games': [make_game(year * 1000 + month * 100 + i, 'alice', 'bob', base + i) for i in range(count)]}
+
+
+def make_fetcher(raw_dir: str, monkeypatch, remote: dict) -> tuple:
+    """Create a fetcher whose session serves the given {(year, month): game count} archives."""
+    fetcher = ChessFetcher(raw_dir)
+    requested = []
+
+    def get(url):
+        requested.append(url)
+        if url == ARCHIVES_URL:
+            return FakeResponse({'archives': [archive_url(y, m) for y, m in sorted(remote)]})
+        year, month = (int(part) for part in url.split('/')[-2:])
+        return FakeResponse(make_archive(year, month, remote[(year, month)]))
+
+    monkeypatch.setattr(fetcher.session, 'get', get)
+    return fetcher, requested
+
+
+def test_download_records_archive_in_catalog(tmp_path, monkeypatch):
+    raw_dir = str(tmp_path / 'raw')
+    fetcher, requested = make_fetcher(raw_dir, monkeypatch, {(2023, 1): 3, (2023, 2): 4})
+
+    stats = fetcher.fetch_user_games('alice', delay=0)
+
+    assert stats['archives_downloaded'] == 2
+    assert stats['total_games'] == 7
+    assert stats['total_bytes'] == sum(os.path.getsize(os.path.join(raw_dir, name))
+                                       for name in ('alice_2023_01.json', 'alice_2023_02.json'))
+    entry = ArchiveCatalog(raw_dir).load()['alice_2023_02.json']
+    assert (entry['user'], entry['year'], entry['month'], entry['games']) == ('alice', 2023, 2, 4)
+
+    # Existing archives are neither downloaded again nor re-counted from disk
+    assert fetcher.fetch_user_games('alice', delay=0)['total_games'] == 7
+    assert len(requested) == 4
+
+
+def test_refresh_catalogs_archives_downloaded_before_the_catalog(tmp_path, monkeypatch):
+    raw_dir = str(tmp_path / 'raw')
+    save_json_safely(make_archive(2022, 12, 5), os.path.join(raw_dir, 'alice_2022_12.json'))
+    fetcher, requested = make_fetcher(raw_dir, monkeypatch, {(2022, 12): 5, (2023, 1): 2})
+
+    stats = fetcher.fetch_user_games('alice', delay=0)
+
+    assert archive_url(2022, 12) not in requested
+    assert stats['total_games'] == 7
+    assert sorted(ArchiveCatalog(raw_dir).load()) == ['alice_2022_12.json', 'alice_2023_01.json']
+
+
+def test_summary_ignores_deleted_archives(tmp_path, monkeypatch):
+    raw_dir = str(tmp_path / 'raw')
+    fetcher, _ = make_fetcher(raw_dir, monkeypatch, {(2021, 6): 3, (2023, 1): 2})
+    assert fetcher.fetch_user_games('alice', delay=0)['total_games'] == 5
+
+    # An archive outside the fetched range is deleted by hand
+    os.remove(os.path.join(raw_dir, 'alice_2021_06.json'))
+    stats = fetcher.fetch_user_games('alice', start_year=2023, delay=0)
+
+    assert stats['total_games'] == 2
+    assert sorted(ArchiveCatalog(raw_dir).load()) == ['alice_2023_01.json']
+
+
+def test_summarize_filters_by_user_and_year(raw_dir):
+    save_json_safely(make_archive(2022, 12, 4), os.path.join(raw_dir, 'alice_2022_12.json'))
+    catalog = ArchiveCatalog(raw_dir)
+    catalog.refresh()
+
+    assert catalog.summarize()['games'] == 4 + 70 + 10
+    assert catalog.summarize('Alice')['games'] == 4 + 30
+    assert catalog.summarize('alice', start_year=2023)['games'] == 30
+    assert catalog.summarize('alice', end_year=2022)['archives'] == 1
+    summary = catalog.summarize('carol')
+    assert (summary['archives'], summary['games']) == (2, 20)
+    assert summary['min_end_time'] < summary['max_end_time']
+
+
+def test_changed_since(tmp_path, monkeypatch):
+    raw_dir = str(tmp_path / 'raw')
+    fetcher, _ = make_fetcher(raw_dir, monkeypatch, {(2023, 1): 1})
+    fetcher.fetch_user_games('alice', delay=0)
+    checkpoint = time.time()
+
+    fetcher, _ = make_fetcher(raw_dir, monkeypatch, {(2023, 1): 1, (2023, 2): 1, (2023, 3): 1})
+    fetcher.fetch_user_games('alice', delay=0)
+
+    assert fetcher.catalog.changed_since(checkpoint) == ['alice_2023_02.json', 'alice_2023_03.json']
+    assert fetcher.catalog.changed_since(0) == ['alice_2023_01.json', 'alice_2023_02.json', 'alice_2023_03.json']
@@ -0,0 +1,116 @@
+"""Tests for the processor's catalog handling and filters."""
+
+import os
+from datetime import datetime
+
+from chess_catalog import ArchiveCatalog, CATALOG_FILENAME
+from chess_process import ChessProcessor, GameFilter
+from utils import load_json_safely, save_json_safely, parse_archive_filename
+
+
+def test_processing_works_with_read_only_raw_directory(tmp_path, raw_dir, monkeypatch):
+    def read_only(*args, **kwargs):
+        raise OSError(30, 'Read-only file system')
+
+    monkeypatch.setattr('chess_catalog.LeaseManager.acquire', read_only)
+
+    assert ChessProcessor(raw_dir, str(tmp_path / 'out')).create_processed_dataset()
+    assert not os.path.exists(os.path.join(raw_dir, CATALOG_FILENAME))
+
+
+def test_only_selected_archives_are_cataloged(raw_dir):
+    processor = ChessProcessor(raw_dir, game_filter=GameFilter(users=['carol']))
+    assert len(processor.process_all_files()) == 20
+    assert sorted(ArchiveCatalog(raw_dir).load()) == ['carol_2023_01.json', 'carol_2023_02.json']
+
+    # A full run catalogs the rest, from the data it loads anyway
+    ChessProcessor(raw_dir).process_all_files()
+    archives = ArchiveCatalog(raw_dir).load()
+    assert len(archives) == 6
+    assert archives['alice_2023_01.json']['games'] == 15
+
+
+def test_user_filter_keeps_other_archives_for_months_without_own_archive(raw_dir):
+    # alice's January games against bob now only exist in bob's archive
+    os.remove(os.path.join(raw_dir, 'alice_2023_01.json'))
+
+    df = ChessProcessor(raw_dir, game_filter=GameFilter(users=['Alice'])).process_all_files()
+
+    assert len(df) == 20
+    assert ((df['white_username'] == 'alice') | (df['black_username'] == 'alice')).all()
+
+
+def test_filter_skips_games_with_null_ratings(raw_dir):
+    archive = os.path.join(raw_dir, 'carol_2023_01.json')
+    data = load_json_safely(archive)
+    data['games'][0]['white']['rating'] = None
+    save_json_safely(data, archive)
+
+    df = ChessProcessor(raw_dir, game_filter=GameFilter(min_rating=1000)).process_all_files()
+
+    assert not df.empty
+    assert data['games'][0]['url'] not in set(df['url'])
+
+
+def test_archive_names_with_invalid_month_are_kept_unparsed(raw_dir, tmp_path):
+    stray = os.path.join(raw_dir, 'backup_2024_13.json')
+    save_json_safely({'games': []}, stray)
+
+    assert parse_archive_filename(stray) is None
+    assert stray in GameFilter(users=['alice']).select_files([stray])
+    assert ChessProcessor(raw_dir, str(tmp_path / 'out'), GameFilter(users=['alice'])).create_processed_dataset()
+
+
+def test_select_files_by_date_range_with_one_day_slack():
+    files = ['a_2023_01.json', 'a_2023_02.json', 'a_2023_03.json', 'a_2023_04.json']
+
+    assert GameFilter(start_date='2023-02-10', end_date='2023-02-20').select_files(files) == ['a_2023_02.json']
+    # Games ending on the first of a month may sit in the previous month's archive
+    assert GameFilter(start_date='2023-03-01').select_files(files) == files[1:]
+    assert GameFilter(end_date='2023-02-28').select_files(files) == files[:3]
+    assert GameFilter().select_files(files) == files
+
+
+def make_raw_game(end_time: int = 1676000000, time_control: str = '180+2',
+                  white_rating: int = 1500, black_rating: int = 1600) -> dict:
+    return {
+        'end_time': end_time,
+        'time_control': time_control,
+        'white': {'username': 'alice', 'rating': white_rating},
+        'black': {'username': 'bob', 'rating': black_rating}
+    }
+
+
+def test_accepts_game_date_range():
+    game_filter = GameFilter(start_date='2023-02-10', end_date='2023-02-20')
+    start = datetime(2023, 2, 10).timestamp()
+    end = datetime(2023, 2, 21).timestamp()
+
+    assert game_filter.accepts_game(make_raw_game(end_time=start))
+    assert game_filter.accepts_game(make_raw_game(end_time=end - 1))
+    assert not game_filter.accepts_game(make_raw_game(end_time=start - 1))
+    assert not game_filter.accepts_game(make_raw_game(end_time=end))
+
+
+def test_accepts_game_type_and_time_control():
+    blitz = GameFilter(game_types=['blitz'])
+    assert blitz.accepts_game(make_raw_game(time_control='300'))
+    assert not blitz.accepts_game(make_raw_game(time_control='60'))
+    assert not blitz.accepts_game(make_raw_game(time_control='1/86400'))
+
+    exact = GameFilter(time_controls=['180+2'])
+    assert exact.accepts_game(make_raw_game(time_control='180+2'))
+    assert not exact.accepts_game(make_raw_game(time_control='180'))
+
+
+def test_accepts_game_rating_bounds_apply_to_both_players():
+    game_filter = GameFilter(min_rating=1500, max_rating=1600)
+
+    assert game_filter.accepts_game(make_raw_game(white_rating=1500, black_rating=1600))
+    assert not game_filter.accepts_game(make_raw_game(white_rating=1499, black_rating=1550))
+    assert not game_filter.accepts_game(make_raw_game(white_rating=1550, black_rating=1601))
+
+
+def test_accepts_game_users_case_insensitive():
+    assert GameFilter(users=['BOB']).accepts_game(make_raw_game())
+    assert not GameFilter(users=['carol']).accepts_game(make_raw_game())
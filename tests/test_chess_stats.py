@@ -0,0 +1,140 @@
+"""Tests for the streaming statistics sketches."""
+
+import json
+import math
+import random
+from collections import Counter
+
+import chess_stats
+from chess_stats import HyperLogLog, QuantileSketch, HeavyHitters, StreamingStats
+
+
+def test_hyperloglog_estimate_within_error_bounds():
+    for n in (100, 10000, 100000):
+        hll = HyperLogLog()
+        for i in range(n):
+            hll.add(f"player{i}")
+        # Three standard errors of 1.04 / sqrt(2**14)
+        assert abs(hll.count() - n) <= 3 * 1.04 / math.sqrt(hll.num_registers) * n + 2
+
+
+def test_hyperloglog_ignores_duplicates_and_merges_as_union():
+    left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    for i in range(6000):
+        left.add(f"player{i}")
+        left.add(f"player{i}")
+    for i in range(4000, 10000):
+        right.add(f"player{i}")
+    for i in range(10000):
+        union.add(f"player{i}")
+
+    left.merge(right)
+
+    assert left.registers == union.registers
+    assert left.count() == union.count()
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.randint(-800, -1) for _ in range(2000)] + [0] * 300 + [rng.randint(1, 3000) for _ in range(3000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for q in (0.0, 0.05, 0.25, 0.4, 0.42, 0.5, 0.75, 0.99, 1.0):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * abs(exact) + 1e-9
+    assert sketch.min == ordered[0]
+    assert sketch.max == ordered[-1]
+
+
+def test_quantiles_of_empty_sketch():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    assert StreamingStats().summary()['rating']['median'] is None
+
+
+def test_quantile_merge_matches_single_sketch():
+    left, right, single = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for value in range(-50, 200):
+        (left if value % 2 else right).add(value)
+        single.add(value)
+
+    left.merge(right)
+
+    assert left.to_dict() == single.to_dict()
+
+
+def assert_misra_gries_bounds(summary: HeavyHitters, stream: list) -> None:
+    true_counts = Counter(stream)
+    error = len(stream) / (summary.capacity + 1)
+    assert summary.total == len(stream)
+    for item, true_count in true_counts.items():
+        estimate = summary.counters.get(item, 0)
+        assert true_count - error <= estimate <= true_count
+    assert len(summary.counters) <= summary.capacity
+
+
+def test_heavy_hitters_lower_bounds_after_shrink_and_merge():
+    rng = random.Random(3)
+    first = [f"op{int(rng.expovariate(0.2))}" for _ in range(5000)]
+    second = [f"op{int(rng.expovariate(0.1))}" for _ in range(5000)]
+
+    left, right = HeavyHitters(capacity=8), HeavyHitters(capacity=8)
+    for item in first:
+        left.add(item)
+    for item in second:
+        right.add(item)
+    assert_misra_gries_bounds(left, first)
+    assert_misra_gries_bounds(right, second)
+
+    left.merge(right)
+    assert_misra_gries_bounds(left, first + second)
+    assert list(left.top(1)) == [Counter(first + second).most_common(1)[0][0]]
+
+
+def make_games(count: int, offset: int = 0) -> list:
+    rng = random.Random(offset)
+    return [{
+        'white_username': f"player{rng.randint(0, 50)}",
+        'black_username': f"player{rng.randint(0, 50)}",
+        'white_rating': rng.randint(800, 2800),
+        'black_rating': rng.randint(800, 2800),
+        'rating_diff': rng.randint(-500, 500),
+        'move_count': rng.randint(0, 120),
+        'opening_name': rng.choice(['Sicilian Defense', 'French Defense', None]),
+        'time_control': rng.choice(['60', '180+2', '600']),
+        'end_time': 1700000000 + offset + i
+    } for i in range(count)]
+
+
+def test_streaming_stats_round_trip():
+    stats = StreamingStats()
+    for game in make_games(500):
+        stats.update(game)
+
+    restored = StreamingStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+
+    assert restored.to_dict() == stats.to_dict()
+    assert restored.summary() == stats.summary()
+    assert all(isinstance(v, int) for v in stats.summary()['rating'].values())
+
+
+def test_main_merges_statistics_files(tmp_path):
+    first, second, expected = StreamingStats(), StreamingStats(), StreamingStats()
+    for game in make_games(300):
+        first.update(game)
+        expected.update(game)
+    for game in make_games(200, offset=1000):
+        second.update(game)
+        expected.update(game)
+    assert first.save(str(tmp_path / 'a.stats.json'))
+    assert second.save(str(tmp_path / 'b.stats.json'))
+
+    chess_stats.main([str(tmp_path / 'a.stats.json'), str(tmp_path / 'b.stats.json'),
+                      '--output', str(tmp_path / 'merged.stats.json'), '--log-level', 'WARNING'])
+
+    merged = StreamingStats.load(str(tmp_path / 'merged.stats.json'))
+    assert merged.games == 500
+    assert merged.to_dict() == expected.to_dict()
@@ -0,0 +1,99 @@
+"""Tests for lease-based distributed processing."""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from chess_process import ChessProcessor
+from chess_leases import LeaseManager
+from chess_stats import StreamingStats
+from chess_worker import DistributedWorker, merge_shards, _run_local_worker
+
+
+def _race_for_leases(lease_dir: str, shards: list, barrier) -> list:
+    manager = LeaseManager(lease_dir, ttl=60)
+    barrier.wait()
+    # Leases are deliberately not released so that later attempts see them
+    return [shard for shard in shards if manager.acquire(shard, f"worker-{os.getpid()}") is not None]
+
+
+def test_concurrent_acquire_is_exclusive(tmp_path):
+    shards = [f"shard{i}" for i in range(20)]
+    ctx = multiprocessing.get_context('fork')
+    with ctx.Manager() as manager:
+        barrier = manager.Barrier(4)
+        with ProcessPoolExecutor(max_workers=4, mp_context=ctx) as executor:
+            futures = [executor.submit(_race_for_leases, str(tmp_path), shards, barrier) for _ in range(4)]
+            won = [shard for future in futures for shard in future.result()]
+
+    assert sorted(won) == sorted(shards)
+
+
+def test_expired_lease_of_dead_owner_is_reclaimed(tmp_path):
+    manager = LeaseManager(str(tmp_path), ttl=0.5)
+    assert manager.acquire('shard', 'dead-worker') is not None
+    assert manager.acquire('shard', 'live-worker') is None
+
+    # The owner died without releasing or renewing its lease
+    lease_path = manager.get_lease_path('shard')
+    old = time.time() - 10
+    os.utime(lease_path, (old, old))
+
+    lease = manager.acquire('shard', 'live-worker')
+    assert lease is not None
+    assert lease.is_owned()
+
+
+def test_empty_lease_file_is_reclaimed_after_ttl(tmp_path):
+    manager = LeaseManager(str(tmp_path), ttl=0.5)
+    lease_path = manager.get_lease_path('shard')
+    open(lease_path, 'w').close()
+    assert manager.acquire('shard', 'worker') is None
+
+    old = time.time() - 10
+    os.utime(lease_path, (old, old))
+    assert manager.acquire('shard', 'worker') is not None
+
+
+def test_acquire_error_leaves_shard_pending(tmp_path, raw_dir, monkeypatch):
+    acquire = LeaseManager.acquire
+    failures = []
+
+    def flaky_acquire(self, shard_id, owner):
+        if not failures:
+            failures.append(shard_id)
+            raise OSError(5, 'Input/output error')
+        return acquire(self, shard_id, owner)
+
+    monkeypatch.setattr(LeaseManager, 'acquire', flaky_acquire)
+
+    worker = DistributedWorker(raw_dir, str(tmp_path / 'work'))
+    assert worker.run(wait=True, poll_interval=0)['shards_processed'] == 6
+    assert len(failures) == 1
+
+
+def test_work_and_merge_matches_single_process(tmp_path, raw_dir):
+    assert ChessProcessor(raw_dir, str(tmp_path / 'single')).create_processed_dataset()
+
+    ctx = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=3, mp_context=ctx) as executor:
+        futures = [executor.submit(_run_local_worker, raw_dir, str(tmp_path / 'work'), 60.0, True, 'WARNING')
+                   for _ in range(3)]
+        results = [future.result() for future in futures]
+    assert sum(r['shards_processed'] for r in results) == 6
+
+    assert merge_shards(raw_dir, str(tmp_path / 'work'), str(tmp_path / 'merged'))
+
+    single = pd.read_csv(tmp_path / 'single' / 'processed.csv')
+    merged = pd.read_csv(tmp_path / 'merged' / 'processed.csv')
+    assert len(single) == 70
+    assert merged.equals(single)
+
+    # Games shared by two archives are counted once in both summaries
+    single_stats = StreamingStats.load(str(tmp_path / 'single' / 'processed.stats.json'))
+    merged_stats = StreamingStats.load(str(tmp_path / 'merged' / 'processed.stats.json'))
+    assert merged_stats.games == 70
+    assert merged_stats.to_dict() == single_stats.to_dict()